@@ -2,11 +2,28 @@
 # jira_api.py – Jira API Integration
 # ===================================
 
+import base64
+import json
 import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from requests.auth import HTTPBasicAuth
+from requests.adapters import HTTPAdapter
+from requests.auth import AuthBase, HTTPBasicAuth
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone
 
+try:
+    import orjson   # optional: decodes large search pages several times faster than json
+except ImportError:
+    orjson = None
+
+# Cost note: the calls in this module are bound by Jira round-trips and JSON
+# decoding, so tuning goes to page size, requested fields, caching and
+# concurrency rather than local compute.
+
 # ====================
 # AUTH & CONFIGURATION
 # ====================
@@ -22,16 +39,85 @@ if not JIRA_BASE_URL:
 if not EMAIL:
     raise ValueError("JIRA_EMAIL not found in environment.")
 
+# Issues requested per page. Larger pages mean fewer round-trips; Jira may return
+# fewer than requested (e.g. with changelog expanded), which _iter_issues adapts to.
+_DEFAULT_PAGE_SIZE = int(os.getenv("JIRA_PAGE_SIZE", "500"))
+
+# === FIELD SETS ===
+# Request only what the parsers read: every extra field inflates the response body,
+# Jira's server-side work and the size of each issue dict held in memory.
+ISSUE_FIELDS = ["summary", "created", "resolutiondate", "assignee", "customfield_10239", "parent"]
+THROUGHPUT_FIELDS = ["created", "resolutiondate", "customfield_10239"]   # counts + KTLO split only
+WIP_FIELDS = ["summary", "status", "created"]
+CYCLE_TIME_FIELDS = ["summary", "resolutiondate", "assignee", "parent"]
+
+# === HTTP SESSION ===
+# One pooled keep-alive session for every Jira call, so paginated fetches pay the
+# TCP+TLS handshake once instead of once per page. Transient failures (rate limits,
+# gateway errors) are retried with backoff by the adapter.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=5,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=["POST"],
+        raise_on_status=False,   # return the last response so its server message is surfaced
+    ),
+))
+# Headers shared by every search call. (requests already sends Accept-Encoding:
+# gzip, deflate by default and decodes compressed responses transparently.)
+_SESSION.headers.update({
+    "Accept": "application/json",
+    "Content-Type": "application/json",
+})
+
 # === AUTH HELPER ===
+class _TokenAuth(AuthBase):
+    """Attach a pre-encoded Basic Authorization header to each request."""
+
+    def __init__(self, email, token):
+        credentials = base64.b64encode(f"{email}:{token}".encode("utf-8")).decode("ascii")
+        self.header = f"Basic {credentials}"
+
+    def __call__(self, r):
+        r.headers["Authorization"] = self.header
+        return r
+
+_AUTH = None   # (token, HTTPBasicAuth) for the token currently installed on the session
+
 def get_auth():
     """
     Load the latest Jira API token from the environment at runtime.
     Ensures token refreshes without restarting Jupyter.
+
+    The Authorization header is encoded once per token value and installed as the
+    shared session's auth handler (which, unlike a session header, takes precedence
+    over ~/.netrc); it is rebuilt only when JIRA_API_TOKEN changes.
     """
+    global _AUTH
     token = os.getenv("JIRA_API_TOKEN")
     if not token:
         raise ValueError("JIRA_API_TOKEN not found in environment.")
-    return HTTPBasicAuth(EMAIL, token)
+    if _AUTH is None or _AUTH[0] != token:
+        _SESSION.auth = _TokenAuth(EMAIL, token)
+        _AUTH = (token, HTTPBasicAuth(EMAIL, token))
+        with _CACHE_LOCK:
+            _CACHE.clear()   # cached pages were fetched with the previous credentials
+    return _AUTH[1]
+
+# === RESPONSE CACHE ===
+# Search pages are memoized for JIRA_CACHE_TTL seconds (default 300), so re-running
+# notebook cells with the same project/lookback doesn't re-query Jira. Expired pages
+# are kept (up to _CACHE_MAXSIZE, least recently used evicted first) and served as a
+# stale fallback if Jira can't be reached.
+_CACHE_TTL = float(os.getenv("JIRA_CACHE_TTL", "300"))
+_CACHE_MAXSIZE = 256
+_CACHE = OrderedDict()   # key -> (fetched_at, response dict)
+_CACHE_LOCK = threading.Lock()
+_PAGE_CAP_WARNED = set()   # query shapes whose page-size cap has been reported
 
 # === RESILIENCE: New JQL search API (cursor pagination) ===
 # Jira removed the old search endpoints. The supported path is:
@@ -39,23 +125,24 @@ def get_auth():
 # It uses a nextPageToken cursor (NOT startAt) and returns isLast/nextPageToken.
 # Ref: Atlassian REST v3 "Issue search" > "Search for issues using JQL enhanced search" docs.
 # === RESILIENCE: New JQL search API (cursor pagination) ===
-def _search_jql(jql: str, max_results: int, next_page_token: str | None, fields, expand=None):
+def _dumps(obj):
+    """Serialize to compact JSON bytes (orjson when available)."""
+    return orjson.dumps(obj) if orjson else json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+def _prepare_search(jql: str, max_results: int, fields, expand=None):
     """
-    Perform a Jira search using the enhanced JQL endpoint with cursor pagination.
+    Build the JSON request body for a search once per query.
+    Only the cursor differs between pages, and _post_search splices it in.
 
     Parameters:
         jql (str): JQL string.
         max_results (int): Page size.
-        next_page_token (str|None): Cursor from previous page (None for first page).
         fields (list[str] | str): Fields to return.
         expand (list[str] | str | None): Optional expansions (e.g., "changelog").
 
     Returns:
-        dict: JSON response from Jira (contains issues, isLast, nextPageToken, ...).
+        bytes: Serialized payload without a nextPageToken.
     """
-    url = f"{JIRA_BASE_URL}/rest/api/3/search/jql"
-    headers = {"Accept": "application/json", "Content-Type": "application/json"}
-
     # Normalize fields to a list
     if isinstance(fields, str):
         fields_list = [f.strip() for f in fields.split(",") if f.strip()]
@@ -78,50 +165,213 @@ def _search_jql(jql: str, max_results: int, next_page_token: str | None, fields,
     }
     if expand_str:
         payload["expand"] = expand_str
+    return _dumps(payload)
+
+def _post_search(body: bytes, next_page_token: str | None = None, refresh=False, stale=None):
+    """
+    Send one page request for a body built by _prepare_search.
+
+    Parameters:
+        body (bytes): Prepared search payload.
+        next_page_token (str|None): Cursor from previous page (None for first page).
+        refresh (bool): Skip the response cache and always query Jira (default False).
+        stale (list|None): Collects (age_seconds, error) for each page served from the
+                           stale cache, so the caller can warn once per fetch.
+
+    Returns:
+        dict: JSON response from Jira (contains issues, isLast, nextPageToken, ...).
+
+    Resilience:
+        - Responses are cached for JIRA_CACHE_TTL seconds (cleared when the token changes).
+        - If the request fails, the last cached response for the same page is
+          returned instead of raising.
+    """
+    get_auth()   # reinstall the session's auth handler (and drop the cache) if the token changed
+    cache_key = (body, next_page_token)
+    with _CACHE_LOCK:
+        cached = _CACHE.get(cache_key)
+        if cached and not refresh and time.monotonic() - cached[0] < _CACHE_TTL:
+            _CACHE.move_to_end(cache_key)
+            return cached[1]
+
     if next_page_token:
-        payload["nextPageToken"] = next_page_token  # cursor pagination
+        # cursor pagination: append the token as the payload's last key
+        body = body[:-1] + b',"nextPageToken":' + _dumps(next_page_token) + b"}"
+
+    try:
+        resp = _SESSION.post(f"{JIRA_BASE_URL}/rest/api/3/search/jql", data=body)
+        if not resp.ok:
+            # Surface server message to pinpoint bad parameter/field quickly
+            raise requests.HTTPError(f"{resp.status_code} for {resp.url}\n{resp.text}")
+    except requests.RequestException as err:
+        if cached is None:
+            raise
+        if stale is not None:
+            stale.append((time.monotonic() - cached[0], err))
+        else:
+            age_min = (time.monotonic() - cached[0]) / 60
+            print(f"⚠️ Jira request failed; using cached results from {age_min:.0f} min ago.\n{err}")
+        return cached[1]
+
+    result = orjson.loads(resp.content) if orjson else resp.json()
+    with _CACHE_LOCK:
+        _CACHE[cache_key] = (time.monotonic(), result)
+        _CACHE.move_to_end(cache_key)
+        while len(_CACHE) > _CACHE_MAXSIZE:
+            _CACHE.popitem(last=False)
+    return result
+
+# === CONCURRENT PAGINATION ===
+# Worker pool for partitioned fetches (one cursor per partition). Sized to stay well
+# under Jira's per-tenant rate limit and within the session's connection pool.
+_EXECUTOR = ThreadPoolExecutor(max_workers=5, thread_name_prefix="jira")
+
+def _iter_issues(jql, max_results, fields, expand=None, refresh=False, stale=None):
+    """
+    Yield every issue matching a JQL query, following the nextPageToken cursor.
+
+    Parameters:
+        jql (str): JQL string.
+        max_results (int): Page size.
+        fields (list[str] | str): Fields to return.
+        expand (list[str] | str | None): Optional expansions (e.g., "changelog").
+        refresh (bool): Bypass the response cache (default False).
+        stale (list|None): Passed to _post_search to collect stale-cache fallbacks.
+
+    Yields:
+        dict: Issue JSON objects, in the order Jira returns them.
+
+    Resilience:
+        - If Jira caps the first page below max_results, later pages request the
+          observed size instead of repeatedly asking for more than is served.
+    """
+    body = _prepare_search(jql, max_results, fields, expand)
+    result = _post_search(body, None, refresh, stale)
+    served = len(result.get("issues", []))
+    if not result.get("isLast") and result.get("nextPageToken") and 0 < served < max_results:
+        # Warn once per query shape (not per partition or re-run); JQL is left out
+        shape = (max_results, served, str(fields), str(expand))
+        with _CACHE_LOCK:
+            first_seen = shape not in _PAGE_CAP_WARNED
+            _PAGE_CAP_WARNED.add(shape)
+        if first_seen:
+            print(f"⚠️ Jira returned {served} of {max_results} requested issues per page; "
+                  f"using page size {served} for these queries.")
+        body = _prepare_search(jql, served, fields, expand)
+
+    while True:
+        yield from result.get("issues", [])
+        token = result.get("nextPageToken")
+        if result.get("isLast") or not token:
+            return
+        result = _post_search(body, token, refresh, stale)
+
+def _fetch_partitions(jqls, max_results, fields, expand=None, refresh=False):
+    """
+    Fetch several disjoint JQL queries concurrently, one cursor per query.
+
+    Parameters:
+        jqls (list[str]): Queries whose result sets do not overlap.
+        max_results (int): Page size.
+        fields (list[str] | str): Fields to return.
+        expand (list[str] | str | None): Optional expansions (e.g., "changelog").
+        refresh (bool): Bypass the response cache (default False).
 
-    resp = requests.post(url, headers=headers, auth=get_auth(), json=payload)
-    if not resp.ok:
-        # Surface server message to pinpoint bad parameter/field quickly
-        raise requests.HTTPError(f"{resp.status_code} for {resp.url}\n{resp.text}")
-    return resp.json()
+    Returns:
+        list: Issues from all queries, concatenated in the order of `jqls`.
+
+    Resilience:
+        - Pages served from the stale cache are reported in one warning per fetch.
+    """
+    stale = []
+
+    def fetch_one(jql):
+        return list(_iter_issues(jql, max_results, fields, expand, refresh=refresh, stale=stale))
+
+    if len(jqls) == 1:
+        issues = fetch_one(jqls[0])
+    else:
+        issues = [issue for batch in _EXECUTOR.map(fetch_one, jqls) for issue in batch]
+
+    if stale:
+        oldest_min = max(age for age, _ in stale) / 60
+        print(f"⚠️ Jira request failed; using cached results for {len(stale)} page(s) "
+              f"(up to {oldest_min:.0f} min old).\n{stale[-1][1]}")
+    return issues
+
+def _n_months_ago_str(months):
+    """
+    First day of the month N calendar months before the current (UTC) month.
+
+    Parameters:
+        months (int): Number of months to look back.
+
+    Returns:
+        str: Date as 'YYYY-MM-DD' (e.g. months=6 in 2025-03 -> '2024-09-01').
+    """
+    now = datetime.now(timezone.utc)
+    year, month = divmod(now.year * 12 + now.month - 1 - months, 12)
+    return f"{year:04d}-{month + 1:02d}-01"
+
+def _resolved_month_partitions(base_jql, start_str, order_by="ORDER BY resolved DESC"):
+    """
+    Split `<base_jql> AND resolved >= start_str` into one query per calendar month.
+
+    Parameters:
+        base_jql (str): Filter clauses without the resolved range or ORDER BY.
+        start_str (str): First day of the earliest month ('YYYY-MM-DD').
+        order_by (str): ORDER BY clause appended to every partition.
+
+    Returns:
+        list[str]: Disjoint queries, newest month first, so that concatenating their
+                   results preserves "ORDER BY resolved DESC" across partitions.
+    """
+    now = datetime.now(timezone.utc)
+    year, month = int(start_str[:4]), int(start_str[5:7])
+
+    bounds = [start_str]
+    while (year, month) < (now.year, now.month):
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        bounds.append(f"{year:04d}-{month:02d}-01")
+
+    jqls = []
+    for lower, upper in zip(bounds, bounds[1:] + [None]):
+        resolved_range = f'resolved >= "{lower}"'
+        if upper:
+            resolved_range += f' AND resolved < "{upper}"'
+        jqls.append(f"{base_jql} AND {resolved_range} {order_by}")
+    return jqls[::-1]
 
 # ======================
 # GENERIC ISSUE FETCHING
 # ======================
 
-def fetch_issues(jql, max_results=100, start_at=0):
+def fetch_issues(jql, max_results=_DEFAULT_PAGE_SIZE, start_at=0, fields=None, refresh=False):
     """
     Execute a JQL query against Jira and return results.
 
     Parameters:
-        jql (str): The Jira Query Language string.
-        max_results (int): Page size (default 100).
+        jql (str | list[str]): The Jira Query Language string, or a list of disjoint
+                               JQL partitions fetched concurrently and concatenated in order.
+        max_results (int): Page size (default JIRA_PAGE_SIZE env var, else 500).
         start_at (int): (Ignored with enhanced search; kept for API compatibility.)
+        fields (list[str] | str | None): Fields to return (default ISSUE_FIELDS).
+        refresh (bool): Bypass the response cache and re-query Jira (default False).
 
     Returns:
         dict: JSON response with a combined 'issues' list (single page shape for callers).
 
     Resilience:
         - Uses POST /rest/api/3/search/jql with cursor pagination (nextPageToken).
+        - Pages are served from a short-lived cache unless refresh=True.
     """
-    all_issues = []
-    token = None
-    while True:
-        result = _search_jql(
-            jql=jql,
-            max_results=max_results,
-            next_page_token=token,
-            fields=["summary", "status", "created", "updated", "resolutiondate", "assignee", "customfield_10239", "parent"]
-        )
-        batch = result.get("issues", [])
-        all_issues.extend(batch)
-
-        # Cursor handling
-        if result.get("isLast") or not result.get("nextPageToken"):
-            break
-        token = result.get("nextPageToken")
+    jqls = [jql] if isinstance(jql, str) else list(jql)
+    all_issues = _fetch_partitions(
+        jqls,
+        max_results=max_results,
+        fields=fields or ISSUE_FIELDS,
+        refresh=refresh
+    )
 
     # Preserve prior return shape for callers expecting a dict with 'issues'
     return {"issues": all_issues}
@@ -130,7 +380,7 @@ def fetch_issues(jql, max_results=100, start_at=0):
 # WIP ISSUE FETCHING (Changelog Required)
 # ===========================
 
-def get_wip_issues(project_key, days=30):
+def get_wip_issues(project_key, days=30, refresh=False):
     """
     Retrieve issues that are currently in progress or were in progress
     during the past N days. This includes changelog data for WIP tracking.
@@ -138,12 +388,14 @@ def get_wip_issues(project_key, days=30):
     Parameters:
         project_key (str): Jira project key (e.g. 'ITNET')
         days (int): Lookback window in days (default 30)
+        refresh (bool): Bypass the response cache and re-query Jira (default False)
 
     Returns:
         list: List of issue dictionaries with changelogs
 
     Resilience:
         - Uses POST /rest/api/3/search/jql with expand=["changelog"] and cursor pagination.
+        - Changelog pages are the heaviest responses; Jira may serve fewer issues per page.
     """
     from datetime import datetime, timedelta, timezone
 
@@ -157,73 +409,52 @@ def get_wip_issues(project_key, days=30):
         f'AND issuetype != Epic ORDER BY created DESC'
     )
 
-    issues = []
-    token = None
-    batch_size = 100
-    while True:
-        result = _search_jql(
-            jql=jql,
-            max_results=batch_size,
-            next_page_token=token,
-            fields=["summary", "status", "created", "resolutiondate"],  # minimal + safe
-            expand=["changelog"]  # required for WIP ranges
-        )
-        batch = result.get("issues", [])
-        issues.extend(batch)
-
-        if result.get("isLast") or not result.get("nextPageToken"):
-            break
-        token = result.get("nextPageToken")
-
-    return issues
+    return _fetch_partitions(
+        [jql],
+        max_results=_DEFAULT_PAGE_SIZE,
+        fields=WIP_FIELDS,
+        expand=["changelog"],  # required for WIP ranges
+        refresh=refresh
+    )
 
 # ================================
 # STANDARD: LAST N MONTHS OF DONE
 # ================================
 
-def get_last_n_months_issues(project_key, months=6):
+def get_last_n_months_issues(project_key, months=6, fields=None, refresh=False):
     """
     Retrieve completed Jira issues for the last N months from a given project.
 
     Parameters:
         project_key (str): The Jira project key (e.g. 'ITNET').
         months (int): Number of months to look back (default 6).
+        fields (list[str] | None): Fields to return (default ISSUE_FIELDS). Pass
+                                   THROUGHPUT_FIELDS when only counts/KTLO are needed.
+        refresh (bool): Bypass the response cache and re-query Jira (default False).
 
     Returns:
         list: List of issue dictionaries.
 
     Resilience:
         - Delegates to fetch_issues(), which uses enhanced JQL with cursor pagination.
+        - The date range is split into monthly partitions fetched concurrently.
     """
-    now = datetime.now(timezone.utc)
-    start_date = now.replace(day=1)
-    # Adjust for cross-year range if needed
-    month = (start_date.month - months + 12) % 12 or 12
-    year = start_date.year if start_date.month > months else start_date.year - 1
-    query_start = start_date.replace(month=month, year=year)
-    start_str = query_start.strftime('%Y-%m-%d')
+    start_str = _n_months_ago_str(months)
 
-    jql = (
+    base_jql = (
         f'project = {project_key} AND status = Done '
-        f'AND issuetype != Epic '
-        f'AND resolved >= "{start_str}" ORDER BY resolved DESC'
+        f'AND issuetype != Epic'
     )
+    jqls = _resolved_month_partitions(base_jql, start_str)
 
-    issues = []
-    start_at = 0  # kept for compatibility; unused by enhanced search
-    while True:
-        result = fetch_issues(jql, start_at=start_at)
-        batch = result.get("issues", [])
-        issues.extend(batch)
-        # fetch_issues now returns ALL pages in one shot; break immediately
-        break
-    return issues
+    # fetch_issues returns ALL pages in one shot
+    return fetch_issues(jqls, fields=fields, refresh=refresh).get("issues", [])
 
 # ===============================
 # CYCLE TIME: WITH CHANGELOG DATA
 # ===============================
 
-def get_cycle_time_issues(project_key, months=6):
+def get_cycle_time_issues(project_key, months=6, refresh=False):
     """
     Retrieve completed issues with changelog for cycle time analysis
     (In Progress → Done duration).
@@ -231,43 +462,27 @@ def get_cycle_time_issues(project_key, months=6):
     Parameters:
         project_key (str): The Jira project key (e.g. 'ITNET').
         months (int): Lookback window in months (default 6).
+        refresh (bool): Bypass the response cache and re-query Jira (default False).
 
     Returns:
         list: List of issue dictionaries with changelog expanded.
 
     Resilience:
         - Uses POST /rest/api/3/search/jql with expand=["changelog"] and cursor pagination.
+        - Changelog pages are the heaviest responses; Jira may serve fewer issues per page.
+        - The date range is split into monthly partitions fetched concurrently.
     """
-    now = datetime.now(timezone.utc)
-    start_date = now.replace(day=1)
-    # Adjust for cross-year range if needed
-    month = (start_date.month - months + 12) % 12 or 12
-    year = start_date.year if start_date.month > months else start_date.year - 1
-    query_start = start_date.replace(month=month, year=year)
-    start_str = query_start.strftime('%Y-%m-%d')
+    start_str = _n_months_ago_str(months)
 
-    jql = (
+    base_jql = (
         f'project = {project_key} AND status = Done '
-        f'AND issuetype != Epic '
-        f'AND resolved >= "{start_str}" ORDER BY resolved DESC'
+        f'AND issuetype != Epic'
     )
 
-    issues = []
-    token = None
-    batch_size = 100
-    while True:
-        result = _search_jql(
-            jql=jql,
-            max_results=batch_size,
-            next_page_token=token,
-            fields=["summary", "status", "created", "resolutiondate", "assignee", "parent"],
-            expand=["changelog"]
-        )
-        batch = result.get("issues", [])
-        issues.extend(batch)
-
-        if result.get("isLast") or not result.get("nextPageToken"):
-            break
-        token = result.get("nextPageToken")
-
-    return issues
+    return _fetch_partitions(
+        _resolved_month_partitions(base_jql, start_str),
+        max_results=_DEFAULT_PAGE_SIZE,
+        fields=CYCLE_TIME_FIELDS,
+        expand=["changelog"],
+        refresh=refresh
+    )
@@ -2,8 +2,14 @@
 # metrics_calculations.py – Metric Functions
 # ==========================================
 
-from datetime import datetime
+from operator import itemgetter
+import numpy as np
 import pandas as pd
+from utils import month_periods, with_month_period
+
+# Cost note: everything here runs locally over a few thousand issues at most and
+# is cheap next to the Jira fetch (jira_api.py). The DataFrame metrics are
+# vectorized pandas/NumPy; the changelog parsers are plain Python loops.
 
 # ============================
 # DATAFRAME TRANSFORMATION
@@ -25,39 +31,47 @@ def parse_issues_to_dataframe(issues):
                       key, summary, created, resolved,
                       lead_time_days, assignee, customfield_10239, parent
     """
-    records = []
-    for issue in issues:
-        fields = issue["fields"]
-        resolution = fields.get("resolutiondate")
-        created = fields.get("created")
-        assignee = fields["assignee"]["displayName"] if fields.get("assignee") else None
-        ktlo_flag = fields.get("customfield_10239")
-
-        # --- Safely extract parent info ---
-        parent_obj = fields.get("parent")
-        parent_key = parent_obj.get("key") if parent_obj else None
-        parent_summary = (
-            parent_obj.get("fields", {}).get("summary") if parent_obj and "fields" in parent_obj else None
-        )
-
-        if resolution and created:
-            created_dt = datetime.strptime(created[:19], "%Y-%m-%dT%H:%M:%S")
-            resolved_dt = datetime.strptime(resolution[:19], "%Y-%m-%dT%H:%M:%S")
-            lead_time = (resolved_dt - created_dt).days
-
-            records.append({
-                "key": issue["key"],
-                "summary": fields["summary"],
-                "created": created_dt,
-                "resolved": resolved_dt,
-                "lead_time_days": lead_time,
-                "assignee": assignee,
-                "customfield_10239": ktlo_flag,
-                "parent": parent_key,
-                "parent_summary": parent_summary
-            })
+    if not issues:
+        return pd.DataFrame()
+
+    # Accumulate column-wise (no per-row dicts); only resolved issues are kept
+    keys, summaries, created_strs, resolved_strs = [], [], [], []
+    assignees, ktlo_values, parent_keys, parent_summaries = [], [], [], []
 
-    return pd.DataFrame(records)
+    for issue in issues:
+        fields = issue.get("fields", {})
+        created_str = fields.get("created")
+        resolved_str = fields.get("resolutiondate")
+        if not created_str or not resolved_str:
+            continue
+
+        assignee = fields.get("assignee") or {}
+        parent = fields.get("parent") or {}
+
+        keys.append(issue.get("key"))
+        summaries.append(fields.get("summary"))
+        # Timestamps keep Jira's wall-clock time (UTC offset dropped), as before
+        created_strs.append(created_str[:19])
+        resolved_strs.append(resolved_str[:19])
+        assignees.append(assignee.get("displayName"))
+        ktlo_values.append(fields.get("customfield_10239"))
+        parent_keys.append(parent.get("key"))
+        parent_summaries.append((parent.get("fields") or {}).get("summary"))
+
+    created = pd.to_datetime(created_strs, format="ISO8601")
+    resolved = pd.to_datetime(resolved_strs, format="ISO8601")
+
+    return pd.DataFrame({
+        "key": keys,
+        "summary": summaries,
+        "created": created,
+        "resolved": resolved,
+        "lead_time_days": (resolved - created).days,
+        "assignee": assignees,
+        "customfield_10239": ktlo_values,
+        "parent": parent_keys,
+        "parent_summary": parent_summaries,
+    })
 
 # =======================
 # THROUGHPUT METRICS
@@ -79,26 +93,30 @@ def calculate_throughput(df):
     """
     if df.empty:
         return pd.DataFrame()
-    df["resolved_month"] = df["resolved"].dt.to_period("M")
-    return df.groupby("resolved_month").size().rename("throughput").reset_index()
+    # Reuse an existing Month column; never add helper columns to the caller's df
+    months = df["Month"] if "Month" in df.columns else month_periods(df["resolved"])
+    return df.groupby(months.rename("resolved_month")).size().rename("throughput").reset_index()
 
 # ------------------------------------------
 # Average Monthly Throughput
 # ------------------------------------------
 
-def calculate_average_throughput(df):
+def calculate_average_throughput(df, monthly=None):
     """
     Calculate the average throughput per month over the range of available data.
 
     Parameters:
         df (pd.DataFrame): Jira issues DataFrame.
+        monthly (pd.DataFrame | None): Result of calculate_throughput(df), if already
+                                       computed (e.g. for a chart), to skip regrouping.
 
     Returns:
         float: Average number of issues resolved per month.
     """
     if df.empty:
         return 0
-    monthly = calculate_throughput(df)
+    if monthly is None:
+        monthly = calculate_throughput(df)
     return monthly["throughput"].mean()
 
 # ------------------------------------------
@@ -117,6 +135,7 @@ def generate_ktlo_summary(df, category_col="Category", value_col="resolved"):
     Returns:
         pd.DataFrame: Summary table with Total, breakdown by category, and category %.
     """
+    df = with_month_period(df)
     throughput_by_category = df.groupby(["Month", category_col]).size().unstack(fill_value=0)
     totals = throughput_by_category.sum(axis=1)
     categories = throughput_by_category.columns.tolist()
@@ -155,7 +174,7 @@ def group_lead_time_by_assignee(df):
     """
     if df.empty:
         return pd.DataFrame()
-    return df.groupby("assignee")["lead_time_days"].mean().reset_index().sort_values(
+    return df.groupby("assignee", observed=True)["lead_time_days"].mean().reset_index().sort_values(
         by="lead_time_days", ascending=False
     )
 
@@ -172,14 +191,23 @@ def identify_outliers(df, z_threshold=2.0):
         z_threshold (float): Z-score threshold for defining an outlier.
 
     Returns:
-        pd.DataFrame: Subset of issues with lead times significantly above the mean.
+        pd.DataFrame: Subset of issues with lead times significantly above the mean,
+                      with a 'z_score' column. The input DataFrame is not modified.
     """
     if df.empty or "lead_time_days" not in df.columns:
         return pd.DataFrame()
-    mean = df["lead_time_days"].mean()
-    std = df["lead_time_days"].std()
-    df["z_score"] = (df["lead_time_days"] - mean) / std
-    return df[df["z_score"].abs() >= z_threshold].sort_values(by="z_score", ascending=False)
+
+    lead_times = df["lead_time_days"].to_numpy(dtype=np.float64)
+    valid = lead_times[~np.isnan(lead_times)]
+    std = valid.std(ddof=1) if valid.size > 1 else 0.0   # sample std, as pandas' .std()
+
+    # No spread (or a single issue): every z-score is undefined, so nothing stands out
+    if std == 0:
+        return df.iloc[0:0].assign(z_score=np.empty(0))
+
+    z_scores = (lead_times - valid.mean()) / std
+    mask = np.abs(z_scores) >= z_threshold
+    return df.loc[mask].assign(z_score=z_scores[mask]).sort_values(by="z_score", ascending=False)
 
 
 
@@ -187,6 +215,32 @@ def identify_outliers(df, z_threshold=2.0):
 # CYCLE TIME METRICS
 # =======================
 
+# ------------------------------------------
+# Changelog Lookup: First Transition Into a Status
+# ------------------------------------------
+
+def _first_transition_to(changelog, status):
+    """
+    Find when an issue first moved into a given status.
+
+    Parameters:
+        changelog (list): Changelog histories, oldest first.
+        status (str): Target status name (e.g. "In Progress").
+
+    Returns:
+        str | None: Raw 'created' timestamp of the first matching history entry.
+                    The walk stops at the first match.
+    """
+    return next(
+        (
+            entry.get("created")
+            for entry in changelog
+            for item in entry.get("items", [])
+            if item.get("field") == "status" and item.get("toString") == status
+        ),
+        None,
+    )
+
 # ------------------------------------------
 # Parse Jira Issues for Cycle Time Analysis
 # ------------------------------------------
@@ -202,51 +256,49 @@ def parse_cycle_time_issues(issues):
     Returns:
         pd.DataFrame: DataFrame with cycle time and key metadata.
     """
-    records = []
+    keys, summaries, assignees = [], [], []
+    in_progress_strs, resolved_strs = [], []
+    parent_keys, parent_summaries = [], []
 
     for issue in issues:
         fields = issue.get("fields", {})
         changelog = issue.get("changelog", {}).get("histories", [])
-
-        key = issue.get("key")
-        summary = fields.get("summary")
-        assignee = fields["assignee"]["displayName"] if fields.get("assignee") else None
         resolved_str = fields.get("resolutiondate")
 
-        # Parent context (optional)
-        parent_obj = fields.get("parent")
-        parent_key = parent_obj.get("key") if parent_obj else None
-        parent_summary = (
-            parent_obj.get("fields", {}).get("summary") if parent_obj and "fields" in parent_obj else None
-        )
+        # First "In Progress" transition (raw timestamp; parsed in bulk below)
+        in_progress_str = _first_transition_to(changelog, "In Progress")
 
-        # Parse resolution time
-        resolved_dt = pd.to_datetime(resolved_str, utc=True) if resolved_str else None
+        if in_progress_str and resolved_str:
+            # Parent context (optional)
+            parent_obj = fields.get("parent")
 
-        # Walk changelog to find first "In Progress"
-        in_progress_dt = None
-        for entry in changelog:
-            for item in entry.get("items", []):
-                if item.get("field") == "status":
-                    to_status = item.get("toString")
-                    if to_status == "In Progress" and in_progress_dt is None:
-                        in_progress_dt = pd.to_datetime(entry.get("created"), utc=True)
+            keys.append(issue.get("key"))
+            summaries.append(fields.get("summary"))
+            assignees.append(fields["assignee"]["displayName"] if fields.get("assignee") else None)
+            in_progress_strs.append(in_progress_str)
+            resolved_strs.append(resolved_str)
+            parent_keys.append(parent_obj.get("key") if parent_obj else None)
+            parent_summaries.append(
+                parent_obj.get("fields", {}).get("summary") if parent_obj and "fields" in parent_obj else None
+            )
 
-        if in_progress_dt and resolved_dt:
-            cycle_time_days = (resolved_dt - in_progress_dt).days
+    if not keys:
+        return pd.DataFrame()
 
-            records.append({
-                "key": key,
-                "summary": summary,
-                "assignee": assignee,
-                "in_progress": in_progress_dt,
-                "resolved": resolved_dt,
-                "cycle_time_days": cycle_time_days,
-                "parent": parent_key,
-                "parent_summary": parent_summary
-            })
+    # One vectorized parse per column instead of one pd.to_datetime call per issue
+    in_progress = pd.to_datetime(in_progress_strs, utc=True, format="ISO8601")
+    resolved = pd.to_datetime(resolved_strs, utc=True, format="ISO8601")
 
-    return pd.DataFrame(records)
+    return pd.DataFrame({
+        "key": keys,
+        "summary": summaries,
+        "assignee": assignees,
+        "in_progress": in_progress,
+        "resolved": resolved,
+        "cycle_time_days": (resolved - in_progress).days,
+        "parent": parent_keys,
+        "parent_summary": parent_summaries,
+    })
 
 
 # ======================
@@ -281,7 +333,6 @@ def parse_wip_ranges(issues, end_date):
         fields = issue.get("fields", {})
         changelog = issue.get("changelog", {}).get("histories", [])
         current_status = fields.get("status", {}).get("name")
-        created_date = pd.to_datetime(fields.get("created"), utc=True)
 
         summary = fields.get("summary")
         assignee = fields.get("assignee", {}).get("displayName") if fields.get("assignee") else None
@@ -289,12 +340,13 @@ def parse_wip_ranges(issues, end_date):
         in_progress_start = None
         in_progress_end = None
 
-        for entry in sorted(changelog, key=lambda x: x["created"]):
+        # Defensive sort; O(n) on Jira's already-ordered (oldest first) histories
+        for entry in sorted(changelog, key=itemgetter("created")):
             for item in entry.get("items", []):
                 if item.get("field") == "status":
                     from_status = item.get("fromString")
                     to_status = item.get("toString")
-                    timestamp = pd.to_datetime(entry.get("created"), utc=True)
+                    timestamp = entry.get("created")   # raw string; parsed in bulk below
 
                     if to_status == "In Progress" and in_progress_start is None:
                         in_progress_start = timestamp
@@ -322,6 +374,7 @@ def parse_wip_ranges(issues, end_date):
 
         # Fallback logic
         if current_status == "In Progress" and issue_key not in seen_keys:
+            created_date = pd.to_datetime(fields.get("created"), utc=True)
             inferred_start = max(created_date, end_date - pd.Timedelta(days=30))
             wip_records.append({
                 "key": issue_key,
@@ -333,10 +386,56 @@ def parse_wip_ranges(issues, end_date):
             seen_keys.add(issue_key)
             missing_details.append((issue_key, summary))
 
+    # Convert every changelog timestamp collected above in one vectorized call
+    raw_stamps = [(record, col) for record in wip_records for col in ("start", "end")
+                  if isinstance(record[col], str)]
+    parsed = pd.to_datetime([record[col] for record, col in raw_stamps], utc=True, format="ISO8601")
+    for (record, col), timestamp in zip(raw_stamps, parsed):
+        record[col] = timestamp
+
     return wip_records, missing_details
 
 
 
+def get_issues_in_progress_by_month(wip_records, target_month_strs):
+    """
+    Returns, for each requested month, the issues that had active WIP time during it.
+    All months are matched against all records in one vectorized interval-overlap pass,
+    so a multi-month report costs one scan of the records rather than one per month.
+
+    Parameters:
+        wip_records (list of dict): List of WIP issues with 'start', 'end', 'key', etc.
+        target_month_strs (list of str): Target months in YYYY-MM format (e.g., ["2025-01", "2025-02"])
+
+    Returns:
+        dict: Month string → pd.DataFrame of matching issues with key metadata
+    """
+    table = pd.DataFrame({
+        "key": [record.get("key") for record in wip_records],
+        "summary": [record.get("summary") for record in wip_records],
+        "assignee": [record.get("assignee") for record in wip_records],
+        "in_progress_start": pd.to_datetime([record["start"] for record in wip_records], utc=True),
+        "in_progress_end": pd.to_datetime([record["end"] for record in wip_records], utc=True),
+    })
+    table["days_in_progress"] = (table["in_progress_end"] - table["in_progress_start"]).dt.days
+
+    month_strs = list(target_month_strs)   # may be a one-shot iterable
+    months = pd.PeriodIndex(month_strs, freq="M")
+    month_starts = months.start_time.to_numpy()
+    month_ends = months.end_time.to_numpy()
+    starts = table["in_progress_start"].dt.tz_convert(None).to_numpy()
+    ends = table["in_progress_end"].dt.tz_convert(None).to_numpy()
+
+    # (records × months) overlap matrix: active if it started before the month ended
+    # and ended after the month started
+    active = (starts[:, None] <= month_ends[None, :]) & (ends[:, None] >= month_starts[None, :])
+
+    return {
+        month: table[active[:, col]].sort_values("in_progress_start")
+        for col, month in enumerate(month_strs)
+    }
+
+
 def get_issues_in_progress_in_month(wip_records, target_month_str):
     """
     Returns issues that had active WIP time during the specified month.
@@ -348,26 +447,4 @@ def get_issues_in_progress_in_month(wip_records, target_month_str):
     Returns:
         pd.DataFrame: Table of matching issues with key metadata
     """
-    import pandas as pd
-    from datetime import timezone
-
-    target_period = pd.Period(target_month_str, freq="M")
-    start_of_month = target_period.start_time.replace(tzinfo=timezone.utc)
-    end_of_month = target_period.end_time.replace(tzinfo=timezone.utc)
-
-    matched = []
-    for record in wip_records:
-        if record["start"] <= end_of_month and record["end"] >= start_of_month:
-            matched.append({
-                "key": record.get("key"),
-                "summary": record.get("summary"),
-                "assignee": record.get("assignee"),
-                "in_progress_start": record["start"],
-                "in_progress_end": record["end"],
-                "days_in_progress": (record["end"] - record["start"]).days
-            })
-
-    df = pd.DataFrame(matched)
-    df.sort_values("in_progress_start", inplace=True)
-    return df
-
+    return get_issues_in_progress_by_month(wip_records, [target_month_str])[target_month_str]
@@ -24,6 +24,24 @@ def timestamp_to_period(series, freq="M"):
     """
     return pd.to_datetime(series).dt.to_period(freq)
 
+def month_periods(dates):
+    """
+    Converts a datetime Series to a monthly PeriodIndex in a single construction.
+    Timezone-aware values (e.g. cycle time 'resolved') are converted to naive UTC first.
+    """
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_convert(None)
+    return pd.PeriodIndex(dates, freq="M")
+
+def with_month_period(df, date_col="resolved"):
+    """
+    Returns df with a 'Month' period column derived from date_col, leaving df untouched.
+    An existing 'Month' column is reused so the conversion happens once per DataFrame.
+    """
+    if "Month" in df.columns:
+        return df
+    return df.assign(Month=month_periods(df[date_col]))
+
 # ----------------------------------------
 # Formatting Utilities
 # ----------------------------------------
@@ -100,3 +118,52 @@ def classify_by_issueflag(flag, match_value="KTLO", match_label="KTLO", default_
         return match_label if flag == match_value else default_label
     else:
         return default_label
+
+
+def make_classifier(sample_value, match_value="KTLO", match_label="KTLO", default_label="Non-KTLO"):
+    """
+    Builds a classify_by_issueflag equivalent specialized for one Jira field shape.
+    A custom field has the same shape (list, dict or str) across a query response,
+    so the type dispatch is resolved once here instead of on every row.
+
+    Parameters:
+        sample_value: A non-null value from the column (None if the column is all null)
+        match_value: What to match against (default: 'KTLO')
+        match_label: Label to return on match
+        default_label: Label to return if no match
+
+    Returns:
+        callable: Non-null flag -> match_label or default_label
+    """
+    if isinstance(sample_value, list):
+        def classify(flag):
+            return match_label if any(isinstance(f, dict) and f.get("value") == match_value for f in flag) else default_label
+    elif isinstance(sample_value, dict):
+        def classify(flag):
+            return match_label if flag.get("value") == match_value else default_label
+    elif isinstance(sample_value, str):
+        def classify(flag):
+            return match_label if flag == match_value else default_label
+    else:
+        def classify(flag):
+            return default_label
+    return classify
+
+def classify_series_by_issueflag(series, match_value="KTLO", match_label="KTLO", default_label="Non-KTLO"):
+    """
+    Classifies a whole column of custom field values (see classify_by_issueflag),
+    dispatching on the field shape once rather than per row.
+
+    Parameters:
+        series (pd.Series): Raw Jira field values
+        match_value: What to match against (default: 'KTLO')
+        match_label: Label to return on match
+        default_label: Label to return if no match (and for null values)
+
+    Returns:
+        pd.Series: match_label or default_label per row
+    """
+    non_null = series.dropna()
+    sample = non_null.iloc[0] if not non_null.empty else None
+    classify = make_classifier(sample, match_value, match_label, default_label)
+    return series.map(classify, na_action="ignore").fillna(default_label)
@@ -2,10 +2,107 @@
 # visualizations.py - Charting Functions
 # ========================================
 
+from datetime import timedelta
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 import seaborn as sns
-from utils import safe_divide, report_outliers
+from matplotlib.transforms import offset_copy
+from metrics_calculations import calculate_throughput, calculate_average_throughput
+from utils import safe_divide, report_outliers, with_month_period
+
+# ==========================
+# FIGURE REUSE
+# ==========================
+
+_FIGURES = {}   # chart_name -> Figure from the chart's previous render
+
+def _reuse_figure(chart_name, figsize, twin=False):
+    """
+    Returns (fig, ax) — or (fig, ax, twin_ax) — for a chart, reusing the Figure from
+    its previous render when that figure is still open (interactive/widget backends),
+    so re-renders skip building a new Figure and canvas. The inline backend closes
+    figures once displayed; a new one is created then.
+    """
+    # Forget figures that have been closed (e.g. shown inline) so they can be freed
+    for name in [n for n, f in _FIGURES.items() if not plt.fignum_exists(f.number)]:
+        del _FIGURES[name]
+
+    fig = _FIGURES.get(chart_name)
+    if fig is not None:
+        fig.clear()
+        fig.set_size_inches(figsize)
+        plt.figure(fig.number)   # make it current for plt.* calls
+    else:
+        fig = plt.figure(figsize=figsize)
+        _FIGURES[chart_name] = fig
+
+    ax = fig.add_subplot()
+    return (fig, ax, ax.twinx()) if twin else (fig, ax)
+
+def _label_points(ax, line, labels, dy=6, **text_kwargs):
+    """
+    Writes one label above each point of a plotted line, dy points up.
+    All labels share one offset transform, which skips annotate()'s per-point
+    offset resolution; x/y come from the line itself, so pandas' date/period
+    axis conversion is already applied.
+    """
+    transform = offset_copy(ax.transData, fig=ax.figure, y=dy, units="points")
+    for (x, y), label in zip(line.get_xydata(), labels):
+        ax.text(x, y, label, transform=transform, ha="center", **text_kwargs)
+
+# ==========================
+# PLOT INPUT PREPARATION
+# ==========================
+
+def prepare_plot_df(df, date_col="resolved"):
+    """
+    Returns df ready for the lead/cycle time charts, leaving df untouched:
+    'Month' as period[M] (derived from date_col when missing) and 'assignee' as
+    a category, so every chart's groupby works on integer codes instead of
+    re-hashing strings. Call once after parsing, before plotting.
+    """
+    df = with_month_period(df, date_col)
+    columns = {}
+    if df["Month"].dtype != "period[M]":
+        columns["Month"] = df["Month"].astype("period[M]")
+    if "assignee" in df.columns and df["assignee"].dtype != "category":
+        columns["assignee"] = df["assignee"].astype("category")
+    return df.assign(**columns) if columns else df
+
+# ==========================
+# SHARED AGGREGATES
+# ==========================
+
+def _monthly_means(df, col, threshold=None):
+    """
+    Mean of col per 'Month' (sorted by month), optionally only over rows with
+    col <= threshold. Groups are formed unsorted and only the month keys are
+    sorted afterwards.
+    """
+    if threshold is None:
+        data = df
+    else:
+        # Materialize only the two columns the groupby needs
+        data = df.loc[df[col].to_numpy() <= threshold, ["Month", col]]
+    return data.groupby("Month", sort=False, observed=True)[col].mean().sort_index()
+
+def _distribution_stats(values):
+    """
+    Returns (mean, 95th percentile, max) of a numeric Series, ignoring NaN.
+    The percentile matches Series.quantile(0.95) (linear interpolation); one
+    np.partition call yields both neighbouring ranks and the max, with no full sort.
+    """
+    vals = values.dropna().to_numpy(dtype=float)
+    if len(vals) == 0:
+        return np.nan, np.nan, np.nan
+
+    pos = 0.95 * (len(vals) - 1)
+    lo = int(pos)
+    hi = min(lo + 1, len(vals) - 1)
+    part = np.partition(vals, sorted({lo, hi, len(vals) - 1}))
+    p95 = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    return vals.mean(), p95, part[-1]
 
 # ==========================
 # THROUGHPUT VISUALIZATIONS
@@ -16,11 +113,13 @@ from utils import safe_divide, report_outliers
 # ----------------------------------------
 
 def plot_throughput_bar(df, project_key):
-    throughput = df.groupby("Month")["resolved"].count()
-    average_throughput = throughput.mean()
+    # One monthly groupby feeds both the bars and the average line
+    monthly = calculate_throughput(with_month_period(df))
+    throughput = monthly.set_index("resolved_month")["throughput"]
+    average_throughput = calculate_average_throughput(df, monthly)
 
-    plt.figure(figsize=(10, 6))
-    ax = throughput.plot(kind="bar", color="skyblue")
+    fig, ax = _reuse_figure("throughput_bar", (10, 6))
+    throughput.plot(kind="bar", color="skyblue", ax=ax)
     ax.set_xticklabels([period.strftime("%B") for period in throughput.index], rotation=45)
     plt.title(f"Monthly Throughput - {project_key.upper()}")
     plt.xlabel("Month")
@@ -35,6 +134,7 @@ def plot_throughput_bar(df, project_key):
                 label=f"Avg: {average_throughput:.1f}")
     plt.legend()
     plt.tight_layout()
+    fig.canvas.draw_idle()
     plt.show()
 
 # ----------------------------------------
@@ -46,6 +146,7 @@ def plot_combined_ktlo_chart(df, project_key, show_outliers=False, clamp_range=(
     Stacked bar chart for KTLO vs Non-KTLO throughput with KTLO % line and average.
     Optional logging of outliers that are visually excluded by clamp_range.
     """
+    df = with_month_period(df)
     throughput_by_category = df.groupby(["Month", "Category"]).size().unstack(fill_value=0)
     ktlo_counts = throughput_by_category.get("KTLO", pd.Series(0, index=throughput_by_category.index))
     non_ktlo_counts = throughput_by_category.get("Non-KTLO", pd.Series(0, index=throughput_by_category.index))
@@ -58,7 +159,7 @@ def plot_combined_ktlo_chart(df, project_key, show_outliers=False, clamp_range=(
 
     ktlo_pct_clamped = ktlo_pct.clip(lower=clamp_range[0], upper=clamp_range[1])
 
-    fig, ax1 = plt.subplots(figsize=(12, 6))
+    fig, ax1, ax2 = _reuse_figure("ktlo_combined", (12, 6), twin=True)
     throughput_by_category.plot(kind="bar", stacked=True, colormap="Set2", ax=ax1)
     ax1.set_ylabel("Number of Issues Resolved")
     ax1.set_xlabel("Month")
@@ -66,7 +167,6 @@ def plot_combined_ktlo_chart(df, project_key, show_outliers=False, clamp_range=(
     ax1.set_xticklabels([p.strftime("%b") for p in ktlo_pct.index], rotation=45)
     ax1.grid(True)
 
-    ax2 = ax1.twinx()
     ax2.plot(ktlo_pct.index.astype(str), ktlo_pct_clamped, color="purple", marker="o", linewidth=2, label="KTLO %")
     ax2.axhline(y=average_ktlo_pct, color="red", linestyle="--", linewidth=1.5, label=f"Avg KTLO %: {average_ktlo_pct:.1f}")
     ax2.set_ylabel("KTLO %")
@@ -82,41 +182,35 @@ def plot_combined_ktlo_chart(df, project_key, show_outliers=False, clamp_range=(
     ax1.legend(lines_1 + lines_2, labels_1 + labels_2, loc="upper right")
 
     plt.tight_layout()
+    fig.canvas.draw_idle()
     plt.show()
 
 
-# ========================
-# LEAD TIME VISUALIZATIONS
-# ========================
-
-# ----------------------------------------
-# Line Chart: Lead Time Trend (Unfiltered)
-# ----------------------------------------
+# ===================================
+# SHARED LEAD / CYCLE TIME CHARTS
+# ===================================
+# Lead and cycle time charts differ only in the metric column, its label
+# (e.g. "Lead Time") and colours; the public plot_* functions below wrap these.
 
-def plot_lead_time_trend(df, project_key):
+def _plot_trend(df, project_key, col, metric, color, ax=None):
     """
-    Plots raw average lead time per month (includes outliers),
-    with data point annotations and a red overall average line.
+    Line chart of the monthly mean of col (all issues) with point labels, an
+    overall average line and a summary table.
     """
-    trend = df.groupby("Month")["lead_time_days"].mean()
+    trend = _monthly_means(df, col)
     overall_avg = trend.mean()
 
-    plt.figure(figsize=(10, 5))
-    ax = trend.plot(marker="o", color="steelblue", label="Monthly Avg Lead Time")
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = _reuse_figure(f"trend:{col}", (10, 5))
+    trend.plot(ax=ax, marker="o", color=color, label=f"Monthly Avg {metric}")
+    line = ax.get_lines()[-1]
 
     # === Add annotations ===
-    for month, value in trend.items():
-        ax.annotate(
-            f"{value:.1f}",
-            xy=(month, value),
-            xytext=(0, 6),
-            textcoords="offset points",
-            ha="center",
-            fontsize=9,
-        )
+    _label_points(ax, line, [f"{value:.1f}" for value in trend], fontsize=9)
 
     # === Draw average line ===
-    plt.axhline(
+    ax.axhline(
         y=overall_avg,
         color='red',
         linestyle='--',
@@ -124,121 +218,167 @@ def plot_lead_time_trend(df, project_key):
         label=f"Overall Avg: {overall_avg:.1f} days"
     )
 
-    plt.title(f"Average Lead Time by Month (Incl. Outliers) – {project_key.upper()}")
-    plt.xlabel("Month")
-    plt.ylabel("Lead Time (days)")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    ax.set_title(f"Average {metric} by Month (Incl. Outliers) – {project_key.upper()}")
+    ax.set_xlabel("Month")
+    ax.set_ylabel(f"{metric} (days)")
+    ax.grid(True)
+    ax.legend()
+    if own_figure:
+        fig.tight_layout()
+        fig.canvas.draw_idle()
+        plt.show()
 
     # === Summary Table ===
     summary = trend.round(1).reset_index()
-    summary.columns = ["Month", "Avg Lead Time (All Issues)"]
+    summary.columns = ["Month", f"Avg {metric} (All Issues)"]
     summary["Month"] = summary["Month"].astype(str)
-    print("\n📊 Monthly Lead Time Averages (Includes Outliers):")
+    print(f"\n📊 Monthly {metric} Averages (Includes Outliers):")
     display(summary)
 
+def _plot_trend_exclude(df, project_key, col, metric, color, start_col,
+                        threshold_days, top_n, ax=None):
+    """
+    Line chart of the monthly mean of col over issues with col <= threshold_days,
+    followed by a summary table and the longest excluded issues.
+    """
+    by_month_filtered = _monthly_means(df, col, threshold_days)
 
-# ----------------------------------------
-# Line Chart: Lead Time Trend (Excludes Outliers > Threshold)
-# ----------------------------------------
-
-def plot_lead_time_trend_exclude_extremes(df, project_key, threshold_days=750):
-    filtered_df = df[df["lead_time_days"] <= threshold_days]
-    all_df = df.copy()
-
-    leadtime_by_month_filtered = filtered_df.groupby("Month")["lead_time_days"].mean()
-    leadtime_by_month_all = all_df.groupby("Month")["lead_time_days"].mean()
-
-    plt.figure(figsize=(10, 6))
-    ax = leadtime_by_month_filtered.plot(marker="o", color="steelblue", label="Avg Lead Time (Filtered)")
-    average_leadtime_filtered = leadtime_by_month_filtered.mean()
-    plt.axhline(y=average_leadtime_filtered, color="red", linestyle="--", linewidth=1.5,
-                label=f"Filtered Avg: {average_leadtime_filtered:.1f} days")
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = _reuse_figure(f"trend_exclude:{col}", (10, 6))
+    by_month_filtered.plot(ax=ax, marker="o", color=color, label=f"Avg {metric} (Filtered)")
+    line = ax.get_lines()[-1]
+    average_filtered = by_month_filtered.mean()
+    ax.axhline(y=average_filtered, color="red", linestyle="--", linewidth=1.5,
+               label=f"Filtered Avg: {average_filtered:.1f} days")
 
-    for month, value in leadtime_by_month_filtered.items():
-        ax.annotate(f"{value:.1f}", xy=(month, value), xytext=(0, 6), textcoords="offset points",
-                    ha="center", fontsize=9)
+    _label_points(ax, line, [f"{value:.1f}" for value in by_month_filtered], fontsize=9)
 
-    plt.title(f"Lead Time Trend (Excludes Issues > {threshold_days}d) - {project_key}")
-    plt.xlabel("Month")
-    plt.ylabel("Lead Time (days)")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
+    ax.set_title(f"{metric} Trend (Excludes Issues > {threshold_days}d) - {project_key}")
+    ax.set_xlabel("Month")
+    ax.set_ylabel(f"{metric} (days)")
+    ax.grid(True)
+    ax.legend()
+    if own_figure:
+        fig.tight_layout()
+        fig.canvas.draw_idle()
+        plt.show()
 
     # Monthly summary (filtered)
-    summary = leadtime_by_month_filtered.round(1).reset_index()
-    summary.columns = ["Month", "Avg Lead Time (Filtered)"]
+    summary = by_month_filtered.round(1).reset_index()
+    summary.columns = ["Month", f"Avg {metric} (Filtered)"]
     summary["Month"] = summary["Month"].astype(str)
     print("\n📊 Monthly Averages (Excludes Outliers):")
     display(summary)
 
     # Outlier table
-    excluded = df[df["lead_time_days"] > threshold_days]
+    excluded = df[df[col] > threshold_days]
     if not excluded.empty:
-        print(f"\n⚠️ Excluded Issues (Lead Time > {threshold_days} days):")
+        print(f"\n⚠️ Excluded Issues ({metric} > {threshold_days} days, longest {min(top_n, len(excluded))} of {len(excluded)}):")
         requested_cols = [
             "key", "summary", "parent_summary",
-            "assignee", "created", "resolved", "lead_time_days"
+            "assignee", start_col, "resolved", col
         ]
-        available_cols = [col for col in requested_cols if col in excluded.columns]
-        display(excluded[available_cols].sort_values(by="lead_time_days", ascending=False))
+        available_cols = [c for c in requested_cols if c in excluded.columns]
+        display(excluded[available_cols].nlargest(top_n, col))
     else:
         print(f"\n✅ No issues exceeded {threshold_days} days.")
 
+def _plot_distribution(df, project_key, col, metric, color, kde=False, ax=None):
+    """
+    Histogram of col with mean / 95th percentile / max lines and bin counts.
+    kde=True overlays a smoothed density curve (costly on large DataFrames).
+    """
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = _reuse_figure(f"distribution:{col}", (10, 6))
+    sns.histplot(df[col], bins=20, kde=kde, color=color, ax=ax)
+    mean, p95, max_val = _distribution_stats(df[col])
+
+    ax.axvline(mean, color="green", linestyle="--", label=f"Mean: {mean:.1f}d")
+    ax.axvline(p95, color="orange", linestyle="--", label=f"95th %ile: {p95:.1f}d")
+    ax.axvline(max_val, color="red", linestyle="--", label=f"Max: {max_val:.1f}d")
+
+    # Label every bin in one batched call (empty bins get no label)
+    bars = ax.containers[-1]
+    ax.bar_label(bars, labels=[f"{int(h)}" if h > 0 else "" for h in bars.datavalues],
+                 padding=4, fontsize=9)
+
+    ax.set_title(f"{metric} Distribution - {project_key.upper()}")
+    ax.set_xlabel(f"{metric} (days)")
+    ax.set_ylabel("Number of Issues")
+    ax.legend()
+    ax.grid(True)
+    if own_figure:
+        fig.tight_layout()
+        fig.canvas.draw_idle()
+        plt.show()
+
+def _plot_heatmap_by_assignee(df, project_key, col, metric, cmap, ax=None):
+    """
+    Single-column heatmap of the mean of col per assignee (highest first),
+    followed by the same numbers as a table.
+    """
+    pivot = (
+        df.groupby("assignee", sort=False, observed=True)[col].mean()
+        .sort_values(ascending=False)
+        .to_frame()
+    )
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = _reuse_figure(f"heatmap:{col}", (8, len(pivot) * 0.5 + 1))
+    sns.heatmap(pivot, annot=True, cmap=cmap, fmt=".1f", ax=ax)
+    ax.set_title(f"Average {metric} by Assignee – {project_key.upper()}")
+    ax.set_xlabel("")
+    ax.set_ylabel("Assignee")
+    if own_figure:
+        fig.tight_layout()
+        fig.canvas.draw_idle()
+        plt.show()
+
+    # Summary table below
+    print(f"\n{project_key.upper()} - {metric} by Assignee:")
+    summary = pivot.reset_index().rename(columns={col: f"Avg {metric} (days)"})
+    display(summary)
+
+# ========================
+# LEAD TIME VISUALIZATIONS
+# ========================
+
 # ----------------------------------------
-# Histogram: Lead Time Distribution
+# Line Chart: Lead Time Trend (Unfiltered)
 # ----------------------------------------
 
-def plot_lead_time_distribution(df, project_key):
-    plt.figure(figsize=(10, 6))
-    ax = sns.histplot(df["lead_time_days"], bins=20, kde=True, color="skyblue")
-    mean = df["lead_time_days"].mean()
-    p95 = df["lead_time_days"].quantile(0.95)
-    max_val = df["lead_time_days"].max()
-
-    plt.axvline(mean, color="green", linestyle="--", label=f"Mean: {mean:.1f}d")
-    plt.axvline(p95, color="orange", linestyle="--", label=f"95th %ile: {p95:.1f}d")
-    plt.axvline(max_val, color="red", linestyle="--", label=f"Max: {max_val:.1f}d")
-
-    for patch in ax.patches:
-        height = patch.get_height()
-        if height > 0:
-            ax.annotate(f"{int(height)}", xy=(patch.get_x() + patch.get_width() / 2, height),
-                        xytext=(0, 4), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=9)
-
-    plt.title(f"Lead Time Distribution - {project_key.upper()}")  # <-- fixed f-string
-    plt.xlabel("Lead Time (days)")
-    plt.ylabel("Number of Issues")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+def plot_lead_time_trend(df, project_key, ax=None):
+    """
+    Plots raw average lead time per month (includes outliers),
+    with data point annotations and a red overall average line.
+    Pass ax to draw into an existing Axes (e.g. a subplot grid); showing the
+    figure is then left to the caller.
+    """
+    _plot_trend(df, project_key, "lead_time_days", "Lead Time", "steelblue", ax)
 
 # ----------------------------------------
-# Heatmap: Lead Time by Assignee
+# Line Chart: Lead Time Trend (Excludes Outliers > Threshold)
 # ----------------------------------------
 
-def plot_lead_time_heatmap_by_assignee(df, project_key):
-    pivot = df.pivot_table(values="lead_time_days", index="assignee", aggfunc="mean").sort_values("lead_time_days", ascending=False)
-    plt.figure(figsize=(8, len(pivot) * 0.5 + 1))
-    sns.heatmap(pivot, annot=True, cmap="Blues", fmt=".1f")
-    plt.title(f"Average Lead Time by Assignee – {project_key.upper()}")
-    plt.xlabel("")
-    plt.ylabel("Assignee")
-    plt.tight_layout()
-    plt.show()
+def plot_lead_time_trend_exclude_extremes(df, project_key, threshold_days=750, top_n=50, ax=None):
+    _plot_trend_exclude(df, project_key, "lead_time_days", "Lead Time", "steelblue", "created",
+                        threshold_days, top_n, ax)
 
-    # Summary table below
-    print(f"\n{project_key.upper()} - Lead Time by Assignee:")
-    summary = pivot.reset_index().rename(columns={"lead_time_days": "Avg Lead Time (days)"})
-    display(summary)
+# ----------------------------------------
+# Histogram: Lead Time Distribution
+# ----------------------------------------
+
+def plot_lead_time_distribution(df, project_key, kde=False, ax=None):
+    _plot_distribution(df, project_key, "lead_time_days", "Lead Time", "skyblue", kde, ax)
 
+# ----------------------------------------
+# Heatmap: Lead Time by Assignee
+# ----------------------------------------
 
+def plot_lead_time_heatmap_by_assignee(df, project_key, ax=None):
+    _plot_heatmap_by_assignee(df, project_key, "lead_time_days", "Lead Time", "Blues", ax)
 
 
 # ==========================
@@ -249,191 +389,126 @@ def plot_lead_time_heatmap_by_assignee(df, project_key):
 # Line Chart: Cycle Time Trend (Excludes Outliers > Threshold)
 # ----------------------------------------
 
-def plot_cycle_time_trend_exclude_extremes(df, project_key, threshold_days=750):
-    filtered_df = df[df["cycle_time_days"] <= threshold_days]
-    all_df = df.copy()
-
-    cycle_by_month_filtered = filtered_df.groupby("Month")["cycle_time_days"].mean()
-    cycle_by_month_all = all_df.groupby("Month")["cycle_time_days"].mean()
-
-    plt.figure(figsize=(10, 6))
-    ax = cycle_by_month_filtered.plot(marker="o", color="teal", label="Avg Cycle Time (Filtered)")
-    avg_cycle_filtered = cycle_by_month_filtered.mean()
-    plt.axhline(y=avg_cycle_filtered, color="red", linestyle="--", linewidth=1.5,
-                label=f"Filtered Avg: {avg_cycle_filtered:.1f} days")
-
-    for month, value in cycle_by_month_filtered.items():
-        ax.annotate(f"{value:.1f}", xy=(month, value), xytext=(0, 6), textcoords="offset points",
-                    ha="center", fontsize=9)
-
-    plt.title(f"Cycle Time Trend (Excludes Issues > {threshold_days}d) - {project_key}")
-    plt.xlabel("Month")
-    plt.ylabel("Cycle Time (days)")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
-
-    # Monthly summary (filtered)
-    summary = cycle_by_month_filtered.round(1).reset_index()
-    summary.columns = ["Month", "Avg Cycle Time (Filtered)"]
-    summary["Month"] = summary["Month"].astype(str)
-    print("\n📊 Monthly Averages (Excludes Outliers):")
-    display(summary)
-
-    # Outlier table
-    excluded = df[df["cycle_time_days"] > threshold_days]
-    if not excluded.empty:
-        print(f"\n⚠️ Excluded Issues (Cycle Time > {threshold_days} days):")
-        requested_cols = [
-            "key", "summary", "parent_summary",
-            "assignee", "in_progress", "resolved", "cycle_time_days"
-        ]
-        available_cols = [col for col in requested_cols if col in excluded.columns]
-        display(excluded[available_cols].sort_values(by="cycle_time_days", ascending=False))
-    else:
-        print(f"\n✅ No issues exceeded {threshold_days} days.")
-
-
+def plot_cycle_time_trend_exclude_extremes(df, project_key, threshold_days=750, top_n=50, ax=None):
+    _plot_trend_exclude(df, project_key, "cycle_time_days", "Cycle Time", "teal", "in_progress",
+                        threshold_days, top_n, ax)
 
 # ----------------------------------------
 # Line Chart: Cycle Time Trend (All Issues, Incl. Outliers)
 # ----------------------------------------
 
-def plot_cycle_time_trend(df, project_key):
+def plot_cycle_time_trend(df, project_key, ax=None):
     """
     Plots raw average cycle time per month (includes outliers),
     with point annotations and a red overall average line.
+    Pass ax to draw into an existing Axes (e.g. a subplot grid); showing the
+    figure is then left to the caller.
     """
-    trend = df.groupby("Month")["cycle_time_days"].mean()
-    overall_avg = trend.mean()
-
-    plt.figure(figsize=(10, 5))
-    ax = trend.plot(marker="o", color="teal", label="Monthly Avg Cycle Time")
-
-    for month, value in trend.items():
-        ax.annotate(
-            f"{value:.1f}",
-            xy=(month, value),
-            xytext=(0, 6),
-            textcoords="offset points",
-            ha="center",
-            fontsize=9,
-        )
-
-    plt.axhline(
-        y=overall_avg,
-        color='red',
-        linestyle='--',
-        linewidth=1.5,
-        label=f"Overall Avg: {overall_avg:.1f} days"
-    )
-
-    plt.title(f"Average Cycle Time by Month (Incl. Outliers) – {project_key.upper()}")
-    plt.xlabel("Month")
-    plt.ylabel("Cycle Time (days)")
-    plt.grid(True)
-    plt.legend()
-    plt.tight_layout()
-    plt.show()
-
-    summary = trend.round(1).reset_index()
-    summary.columns = ["Month", "Avg Cycle Time (All Issues)"]
-    summary["Month"] = summary["Month"].astype(str)
-    print("\n📊 Monthly Cycle Time Averages (Includes Outliers):")
-    display(summary)
-
-
+    _plot_trend(df, project_key, "cycle_time_days", "Cycle Time", "teal", ax)
 
 # ----------------------------------------
 # Histogram: Cycle Time Distribution
 # ----------------------------------------
 
-def plot_cycle_time_distribution(df, project_key):
-    plt.figure(figsize=(10, 6))
-    ax = sns.histplot(df["cycle_time_days"], bins=20, kde=True, color="lightseagreen")
-    mean = df["cycle_time_days"].mean()
-    p95 = df["cycle_time_days"].quantile(0.95)
-    max_val = df["cycle_time_days"].max()
-
-    plt.axvline(mean, color="green", linestyle="--", label=f"Mean: {mean:.1f}d")
-    plt.axvline(p95, color="orange", linestyle="--", label=f"95th %ile: {p95:.1f}d")
-    plt.axvline(max_val, color="red", linestyle="--", label=f"Max: {max_val:.1f}d")
-
-    for patch in ax.patches:
-        height = patch.get_height()
-        if height > 0:
-            ax.annotate(f"{int(height)}", xy=(patch.get_x() + patch.get_width() / 2, height),
-                        xytext=(0, 4), textcoords="offset points",
-                        ha='center', va='bottom', fontsize=9)
-
-    plt.title(f"Cycle Time Distribution - {project_key.upper()}")  # <-- fixed f-string
-    plt.xlabel("Cycle Time (days)")
-    plt.ylabel("Number of Issues")
-    plt.legend()
-    plt.grid(True)
-    plt.tight_layout()
-    plt.show()
+def plot_cycle_time_distribution(df, project_key, kde=False, ax=None):
+    _plot_distribution(df, project_key, "cycle_time_days", "Cycle Time", "lightseagreen", kde, ax)
 
 # ----------------------------------------
 # Heatmap: Cycle Time by Assignee
 # ----------------------------------------
 
-def plot_cycle_time_heatmap_by_assignee(df, project_key):
-    pivot = df.pivot_table(values="cycle_time_days", index="assignee", aggfunc="mean").sort_values("cycle_time_days", ascending=False)
-    plt.figure(figsize=(8, len(pivot) * 0.5 + 1))
-    sns.heatmap(pivot, annot=True, cmap="Greens", fmt=".1f")
-    plt.title(f"Average Cycle Time by Assignee - {project_key.upper()}")
-    plt.xlabel("")
-    plt.ylabel("Assignee")
-    plt.tight_layout()
-    plt.show()
-
-    print("\nCycle Time by Assignee:")
-    summary = pivot.reset_index().rename(columns={"cycle_time_days": "Avg Cycle Time (days)"})
-    display(summary)
+def plot_cycle_time_heatmap_by_assignee(df, project_key, ax=None):
+    _plot_heatmap_by_assignee(df, project_key, "cycle_time_days", "Cycle Time", "Greens", ax)
 
 
 # ==========================
 # WIP VISUALIZATIONS
 # ==========================
 
+# ----------------------------------------
+# Shared: Daily WIP Counts
+# ----------------------------------------
+
+_DAY_NS = 86_400_000_000_000
+
+def _wip_bounds(wip_records):
+    """
+    Returns the records' starts and ends as naive-UTC datetime64[ns] arrays.
+    """
+    def as_utc_ns(values):
+        return pd.to_datetime(values, utc=True).tz_convert(None).as_unit("ns").to_numpy()
+
+    return (as_utc_ns([r["start"] for r in wip_records]),
+            as_utc_ns([r["end"] for r in wip_records]))
+
+def _daily_window(lookback):
+    """
+    Returns UTC days (midnight) from today minus lookback (a timedelta or
+    pd.DateOffset) through today.
+    """
+    today = pd.Timestamp.now(tz="UTC").normalize()
+    return pd.date_range(start=today - lookback, end=today, freq="D")
+
+def _wip_day_spans(wip_records):
+    """
+    Returns each record's first and last counted day as int64 day numbers
+    (days since the epoch, UTC). A record counts on a day if it started by the
+    end of that day and was still open at its last instant (23:59:59.999999).
+    """
+    starts, ends = (bounds.view("i8") for bounds in _wip_bounds(wip_records))
+    return starts // _DAY_NS, (ends + 1_000) // _DAY_NS - 1
+
+def _compute_daily_wip(wip_records, date_range):
+    """
+    Count how many WIP records are in progress on each day of a date range.
+
+    Parameters:
+        wip_records (list of dict): WIP ranges with tz-aware 'start' and 'end'.
+        date_range (pd.DatetimeIndex): Consecutive UTC days (freq='D') to count.
+
+    Returns:
+        np.ndarray: int32 counts aligned with date_range (see _wip_day_spans).
+    """
+    nday = len(date_range)
+    if nday == 0:
+        return np.zeros(0, dtype=np.int32)
+    day0 = date_range[0].value // _DAY_NS
+    first_days, last_days = _wip_day_spans(wip_records)
+
+    # Difference array over integer day offsets: each record adds +1 on its first
+    # counted day and -1 just past its last one, clipped to the window.
+    first = np.clip(first_days - day0, 0, nday)
+    stop = np.clip(last_days + 1 - day0, 0, nday)
+    active = first < stop
+    diff = (np.bincount(first[active], minlength=nday + 1)
+            - np.bincount(stop[active], minlength=nday + 1))
+    return np.cumsum(diff[:-1], dtype=np.int32)
+
 # ----------------------------------------
 # Line Chart: Daily WIP Trend
 # ----------------------------------------
 
 def plot_daily_wip_time_series(wip_records, days_lookback, project_key):
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    from datetime import datetime, timedelta, timezone
-
     # Compute daily range
-    end_date = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - timedelta(days=days_lookback)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D', tz="UTC")
+    date_range = _daily_window(timedelta(days=days_lookback))
 
     # Count issues in progress on each day
-    wip_counts = pd.Series(0, index=date_range)
-    for record in wip_records:
-        start = record["start"]
-        end = record["end"]
-        for day in date_range:
-            if start <= day <= end:
-                wip_counts[day] += 1
+    wip_counts = pd.Series(_compute_daily_wip(wip_records, date_range), index=date_range)
 
     # === Plot ===
-    plt.figure(figsize=(12, 6))
-    ax = wip_counts.plot()
+    fig, ax = _reuse_figure("daily_wip", (12, 6))
+    wip_counts.plot(ax=ax)
+    line = ax.get_lines()[-1]
     plt.title(f"Daily Work in Progress (WIP) – Last {days_lookback} Days - {project_key.upper()}")
     plt.xlabel("Date")
     plt.ylabel("Number of In Progress Items")
     plt.grid(True)
 
-    for i in range(len(wip_counts)):
-        ax.annotate(f"{wip_counts.iloc[i]}", (wip_counts.index[i], wip_counts.iloc[i]),
-                    textcoords="offset points", xytext=(0, 6), ha='center', fontsize=8, color='darkgreen')
+    _label_points(ax, line, [str(count) for count in wip_counts],
+                  fontsize=8, color='darkgreen')
 
     plt.tight_layout()
+    fig.canvas.draw_idle()
     plt.show()
 
     # === Summary Lines ===
@@ -448,50 +523,26 @@ def plot_daily_wip_time_series(wip_records, days_lookback, project_key):
 # ----------------------------------------
 
 def show_daily_wip_table(wip_records, days_lookback, project_key):
-    import pandas as pd
-    from datetime import datetime, timedelta, timezone
-
-    end_date = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - timedelta(days=days_lookback)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D', tz="UTC")
-
-    wip_counts = pd.Series(0, index=date_range)
-    for record in wip_records:
-        start = record["start"]
-        end = record["end"]
-        for day in date_range:
-            if start <= day <= end:
-                wip_counts[day] += 1
+    date_range = _daily_window(timedelta(days=days_lookback))
 
+    # Display-only table: wrap the int32 counts as-is (no Series, no copy)
     table = pd.DataFrame({
-        "Date": wip_counts.index.strftime("%b %d"),
-        "WIP Count": wip_counts.values
-    })
+        "Date": date_range.strftime("%b %d"),
+        "WIP Count": _compute_daily_wip(wip_records, date_range)
+    }, copy=False)
 
     print(f"\n📅 Daily {project_key.upper()} WIP Table:")
     display(table)
 
 
 def debug_daily_wip_table(wip_records, days_lookback):
-    import pandas as pd
-    from datetime import datetime, timedelta, timezone
-
-    end_date = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - timedelta(days=days_lookback)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D', tz="UTC")
-
-    wip_counts = pd.Series(0, index=date_range)
-    for record in wip_records:
-        start = record["start"]
-        end = record["end"]
-        for day in date_range:
-            if start <= day <= end:
-                wip_counts[day] += 1
+    date_range = _daily_window(timedelta(days=days_lookback))
 
+    # Display-only table: wrap the int32 counts as-is (no Series, no copy)
     df = pd.DataFrame({
-        "Date": wip_counts.index.strftime("%b %d"),
-        "WIP Count": wip_counts.values
-    })
+        "Date": date_range.strftime("%b %d"),
+        "WIP Count": _compute_daily_wip(wip_records, date_range)
+    }, copy=False)
 
     print("📅 Daily WIP Table:")
     display(df)
@@ -501,21 +552,9 @@ def debug_daily_wip_table(wip_records, days_lookback):
 # ----------------------------------------
 
 def plot_monthly_average_wip(wip_records, months_lookback, project_key):
-    import pandas as pd
-    import matplotlib.pyplot as plt
-    from datetime import datetime, timezone
-
-    end_date = datetime.now(timezone.utc).replace(hour=23, minute=59, second=59, microsecond=999999)
-    start_date = end_date - pd.DateOffset(months=months_lookback)
-    date_range = pd.date_range(start=start_date, end=end_date, freq='D', tz="UTC")
-
-    wip_counts = pd.Series(0, index=date_range)
-    for record in wip_records:
-        start = record["start"]
-        end = record["end"]
-        for day in date_range:
-            if start <= day <= end:
-                wip_counts[day] += 1
+    date_range = _daily_window(pd.DateOffset(months=months_lookback))
+
+    wip_counts = pd.Series(_compute_daily_wip(wip_records, date_range), index=date_range)
 
     df = pd.DataFrame({
         "date": wip_counts.index,
@@ -527,19 +566,19 @@ def plot_monthly_average_wip(wip_records, months_lookback, project_key):
     monthly_avg = df.groupby("month")["wip"].mean().reset_index()
     monthly_avg["month_str"] = monthly_avg["month"].astype(str)
 
-    plt.figure(figsize=(10, 6))
-    ax = monthly_avg.set_index("month_str")["wip"].plot(kind="bar", color="seagreen")
+    fig, ax = _reuse_figure("monthly_avg_wip", (10, 6))
+    monthly_avg.set_index("month_str")["wip"].plot(kind="bar", color="seagreen", ax=ax)
     ax.set_title(f"Monthly Average WIP (Daily-based) – {project_key.upper()}")  # <-- include key
     ax.set_xlabel("Month")
     ax.set_ylabel("Average Daily WIP")
     ax.set_xticklabels(monthly_avg["month"].dt.strftime("%b %Y"), rotation=45)
 
-    for idx, val in enumerate(monthly_avg["wip"]):
-        ax.annotate(f"{val:.1f}", xy=(idx, val), xytext=(0, 3), textcoords="offset points",
-                    ha='center', fontsize=9)
+    ax.bar_label(ax.containers[-1], labels=[f"{val:.1f}" for val in monthly_avg["wip"]],
+                 padding=3, fontsize=9)
 
     plt.grid(True)
     plt.tight_layout()
+    fig.canvas.draw_idle()
     plt.show()
 
 # ----------------------------------------
@@ -547,14 +586,14 @@ def plot_monthly_average_wip(wip_records, months_lookback, project_key):
 # ----------------------------------------
 
 def debug_monthly_wip_aggregation(wip_records, months_lookback):
-    import pandas as pd
-
-    all_days = []
-    for record in wip_records:
-        all_days.extend(pd.date_range(start=record["start"], end=record["end"], freq='D'))
-
-    wip_df = pd.DataFrame({"date": all_days})
-    wip_df["date"] = wip_df["date"].dt.tz_localize(None)
+    # Expand every record into daily steps from its start through its end (same
+    # points as pd.date_range(start, end, freq='D')) without a per-record loop
+    starts, ends = (bounds.view("i8") for bounds in _wip_bounds(wip_records))
+    lengths = np.maximum((ends - starts) // _DAY_NS + 1, 0)
+    steps = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    all_days = np.repeat(starts, lengths) + steps * _DAY_NS
+
+    wip_df = pd.DataFrame({"date": all_days.view("datetime64[ns]")})
     wip_df["month"] = wip_df["date"].dt.to_period("M")
 
     max_month = wip_df["month"].max()
@@ -566,7 +605,7 @@ def debug_monthly_wip_aggregation(wip_records, months_lookback):
     display(daily_counts)
 
     monthly_avg = wip_df.groupby("month").size().rename("WIP Days").reset_index()
-    monthly_avg["Avg WIP"] = monthly_avg["WIP Days"] / monthly_avg["month"].apply(lambda m: m.days_in_month)
+    monthly_avg["Avg WIP"] = monthly_avg["WIP Days"] / monthly_avg["month"].dt.days_in_month
 
     print("\n📆 Monthly Aggregated WIP Averages:")
     display(monthly_avg)